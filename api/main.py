@@ -1,8 +1,27 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+import resources
+from conversation import SessionStore
 from query_engine import handle_query  # your function for embedding + RAG
 
-app = FastAPI()
+# Clients the /query path needs; built once at startup instead of at import time
+WARM_UP_RESOURCES = [
+    "openai",
+    "vector_store" if resources.VECTOR_BACKEND == "local" else "pinecone_index",
+    "triple_store",
+    "summary_index",
+]
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.warm_up = resources.warm_up(WARM_UP_RESOURCES)
+    yield
+
+
+app = FastAPI(lifespan=lifespan)
+sessions = SessionStore()
 
 # Allow frontend on localhost:3000
 app.add_middleware(
@@ -17,5 +36,10 @@ app.add_middleware(
 async def query_backend(request: Request):
     data = await request.json()
     user_query = data.get("question", "")
-    history = data.get("history", [])
-    return handle_query(user_query, history)
+    session_id, conversation = sessions.get_or_create(data.get("session_id"))
+    if not conversation.turns and data.get("history"):
+        # New session from a client that keeps its own history
+        conversation.seed_from_messages(data["history"])
+    result = handle_query(user_query, conversation=conversation)
+    result["session_id"] = session_id
+    return result
@@ -54,8 +54,12 @@ with st.container():
 if search and query:
     with st.spinner("Powered by Deloitte’s deep sector knowledge and data assets…"):
         try:
-            response = requests.post("http://localhost:8000/query", json={"question": query})
+            response = requests.post(
+                "http://localhost:8000/query",
+                json={"question": query, "session_id": st.session_state.get("session_id")}
+            )
             result = response.json()
+            st.session_state["session_id"] = result.get("session_id")
 
             st.divider()
             col1, col2 = st.columns([3, 1])
@@ -0,0 +1,279 @@
+import sys
+import time
+import argparse
+import subprocess
+
+# Modules that must stay cheap to import (uvicorn --reload, CLI --help)
+IMPORT_TARGETS = ["query_engine", "query_pinecone", "embed_and_store", "extract_triples", "api.main"]
+DEFAULT_IMPORT_TARGET_S = 1.0
+DEFAULT_RECALL_TARGET = 0.98
+
+
+def measure_import_time(module: str, repeats: int = 3) -> float:
+    """
+    Measure the best-of-N wall time to import a module in a fresh interpreter.
+
+    Parameters:
+        module (str): Dotted module name, importable from the repo root.
+        repeats (int): Number of fresh interpreters to time.
+
+    Returns:
+        float: Fastest import time in seconds, interpreter startup excluded.
+    """
+    code = (
+        "import time; start = time.perf_counter(); "
+        f"import {module}; print(time.perf_counter() - start)"
+    )
+    timings = []
+    for _ in range(repeats):
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"Importing {module} failed:\n{result.stderr.strip()}")
+        timings.append(float(result.stdout.strip().splitlines()[-1]))
+    return min(timings)
+
+
+def bench_imports(target_s: float, repeats: int) -> bool:
+    ok = True
+    for module in IMPORT_TARGETS:
+        try:
+            elapsed = measure_import_time(module, repeats)
+        except RuntimeError as e:
+            print(f"- {module}: ERROR\n{e}")
+            ok = False
+            continue
+        status = "OK" if elapsed <= target_s else "SLOW"
+        ok = ok and elapsed <= target_s
+        print(f"- {module}: {elapsed * 1000:.0f} ms [{status}]")
+    return ok
+
+
+def synthetic_embeddings(n: int, dim: int = 1536, seed: int = 0):
+    """
+    Clustered, low-rank unit vectors that mimic the similarity structure of text embeddings.
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    basis = rng.standard_normal((64, dim)).astype(np.float32)
+    centers = rng.standard_normal((max(n // 50, 1), 64)).astype(np.float32)
+    latent = centers[rng.integers(len(centers), size=n)] + 0.5 * rng.standard_normal((n, 64)).astype(np.float32)
+    vectors = latent @ basis + 0.3 * rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+# Real questions embedded as recall queries when a local store exists
+BENCH_TOPICS = [
+    "What are {}'s strategic priorities?",
+    "How did {}'s revenue and expenses change in 2024?",
+    "What does the government mandate letter ask {} to deliver?",
+    "Which technology and health programs does {} offer?",
+    "How is {} supporting Indigenous students and reconciliation?",
+]
+
+
+def real_query_embeddings():
+    """
+    Embed BENCH_TOPICS for every institution with the query model, or return None if
+    the embedding API is unavailable.
+    """
+    import numpy as np
+    from institutions import INSTITUTION_ALIASES
+
+    try:
+        from query_engine import get_query_embedding
+        questions = [topic.format(name) for name in INSTITUTION_ALIASES for topic in BENCH_TOPICS]
+        return np.array([get_query_embedding(q) for q in questions], dtype=np.float32)
+    except Exception as e:
+        print(f"- Could not embed benchmark questions ({e}); holding out stored vectors instead")
+        return None
+
+
+def _peak_allocation(fn, *args, **kwargs) -> int:
+    import tracemalloc
+
+    tracemalloc.start()
+    fn(*args, **kwargs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def bench_recall(vector_dir: str, n: int, num_queries: int, k: int, rerank: int, target: float) -> bool:
+    """
+    Compare int8 search + exact re-ranking against exact float search.
+
+    Queries never come from the indexed rows: with a local store in `vector_dir` they are
+    real question embeddings (or, without API access, held-out stored vectors); otherwise
+    n + num_queries synthetic vectors are drawn and the queries are held out.
+    """
+    import os
+    import numpy as np
+    from vector_store import LocalVectorStore
+
+    rng = np.random.default_rng(1)
+    if os.path.isdir(vector_dir):
+        vectors = np.asarray(LocalVectorStore.load(vector_dir).full, dtype=np.float32)
+        queries = real_query_embeddings()
+        if queries is None:
+            held_out = rng.permutation(len(vectors))[:num_queries]
+            queries = vectors[held_out]
+            vectors = np.delete(vectors, held_out, axis=0)
+        print(f"- Using {len(vectors)} vectors from {vector_dir}/, {len(queries)} queries")
+    else:
+        vectors = synthetic_embeddings(n + num_queries)
+        vectors, queries = vectors[:n], vectors[n:]
+        print(f"- Using {n} synthetic vectors, {num_queries} held-out queries ({vector_dir}/ not found)")
+
+    store = LocalVectorStore.from_vectors(vectors)
+    full = np.asarray(store.full, dtype=np.float32)
+
+    hits = 0
+    approx_s = exact_s = 0.0
+    for query in queries:
+        start = time.perf_counter()
+        approx = {row_id for row_id, _ in store.search(query, top_k=k, rerank=rerank)}
+        approx_s += time.perf_counter() - start
+        start = time.perf_counter()
+        exact = {row_id for row_id, _ in store.exact_search(query, top_k=k)}
+        exact_s += time.perf_counter() - start
+        hits += len(approx & exact)
+
+    recall = hits / (k * len(queries))
+    # The scan scratch block is allocated per search, so the traced peak includes it
+    approx_peak = store.codes.nbytes + store.scales.nbytes + _peak_allocation(store.search, queries[0], top_k=k,
+                                                                              rerank=rerank)
+    exact_peak = full.nbytes + _peak_allocation(store.exact_search, queries[0], top_k=k)
+    print(f"- recall@{k}: {recall:.4f} [{'OK' if recall >= target else 'LOW'}] (rerank={rerank})")
+    print(f"- Peak search memory: {approx_peak / 1e6:.1f} MB quantized (int8 codes + scan scratch) vs "
+          f"{exact_peak / 1e6:.1f} MB exact ({exact_peak / approx_peak:.1f}x smaller)")
+    print(f"- Mean latency: {approx_s / len(queries) * 1000:.2f} ms quantized, "
+          f"{exact_s / len(queries) * 1000:.2f} ms exact")
+    return recall >= target
+
+
+def has_amount(text: str) -> bool:
+    from chunker import AMOUNT_PATTERN
+    return any(AMOUNT_PATTERN.match(cell.strip()) for cell in text.split(" | "))
+
+
+def bench_chunking(documents_path: str, pdf_root: str) -> bool:
+    """
+    Check the layout chunker on the source PDFs: statement rows (a label with amount
+    cells) stay one unit each, never merged with another row after them, no unit or
+    packed chunk exceeds its profile's size, and prose is never joined into " | " cells
+    (only separators printed in the PDF itself may appear).
+    """
+    import os
+    import json
+    import pymupdf
+    from chunker import _page_lines, _rows, get_profile, layout_units, pack_units
+
+    with open(documents_path, "r", encoding="utf-8") as f:
+        sources = sorted({
+            (d["metadata"]["source"].replace("\\", "/"), d["metadata"]["doc_type"])
+            for d in json.load(f)
+        })
+
+    passed = True
+    for source, doc_type in sources:
+        path = os.path.join(pdf_root, source)
+        if not os.path.exists(path):
+            print(f"- {source}: not found, skipped")
+            continue
+        profile = get_profile(doc_type)
+        pages = merged = oversized = piped = 0
+        units = []
+        with pymupdf.open(path) as document:
+            for page in document:
+                page_units = layout_units(page, doc_type)
+                pages += 1
+                units.extend(page_units)
+                oversized += sum(len(u) > profile["max_chars"] for u in page_units)
+                if profile["records"]:
+                    rows = {r["text"] for r in _rows(_page_lines(page), split_cells=True)
+                            if r["cells"] > 1 and has_amount(r["text"])}
+                    for unit in page_units:
+                        found = [r for r in rows if r in unit]
+                        # "2024 | 2023" also occurs inside "Note | 2024 | 2023"
+                        found = [r for r in found if not any(r != other and r in other for other in found)]
+                        merged += len(found) > 1 or any(not unit.endswith(r) for r in found)
+                elif sum(u.count(" | ") for u in page_units) > page.get_text().count("|"):
+                    piped += 1
+        chunks = pack_units(units, profile["max_chars"], profile["overlap_units"])
+        oversized_chunks = sum(len(c) > profile["max_chars"] for c in chunks)
+        ok = not (merged or oversized or oversized_chunks or piped)
+        passed = passed and ok
+        print(f"- {source}: {pages} pages, {len(units)} units, {len(chunks)} chunks, {merged} merged rows, "
+              f"{oversized} oversized units, {oversized_chunks} oversized chunks, "
+              f"{piped} pages with prose cells [{'OK' if ok else 'FAIL'}]")
+    return passed
+
+
+def bench_routing() -> bool:
+    """
+    Check `route_overview` on ROUTING_EXAMPLES against an index that has a digest for
+    every institution and document type, and its fallback for a thin digest.
+    """
+    from institutions import DOC_TYPE_KEYWORDS, INSTITUTION_ALIASES
+    from summaries import MIN_DIGEST_TRIPLES, ROUTING_EXAMPLES, route_overview
+
+    digest = {"digest": "", "sources": [], "triple_count": MIN_DIGEST_TRIPLES}
+    index = {"institutions": {
+        institution: {"digests": {doc_type: digest for doc_type in DOC_TYPE_KEYWORDS}}
+        for institution in INSTITUTION_ALIASES
+    }}
+    passed = True
+    for question, expected in ROUTING_EXAMPLES:
+        selected = route_overview(question, index)
+        routed = None if selected is None else [d["doc_type"] for d in selected]
+        ok = routed == expected
+        passed = passed and ok
+        print(f"- {question!r}: {', '.join(routed) if routed else 'full retrieval'} [{'OK' if ok else 'FAIL'}]")
+
+    # A digest built from too few triples is never answered from
+    question, _ = ROUTING_EXAMPLES[0]
+    index["institutions"]["Douglas College"]["digests"]["Strategic Plan"] = {**digest, "triple_count": MIN_DIGEST_TRIPLES - 1}
+    ok = route_overview(question, index) is None
+    passed = passed and ok
+    print(f"- {question!r} with a thin digest: full retrieval [{'OK' if ok else 'FAIL'}]")
+    return passed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Performance benchmarks for the query API and pipeline scripts.")
+    parser.add_argument("--import-target", type=float, default=DEFAULT_IMPORT_TARGET_S,
+                        help="Maximum allowed import time per module, in seconds")
+    parser.add_argument("--repeats", type=int, default=3, help="Fresh interpreters to time per module")
+    parser.add_argument("--skip-imports", action="store_true", help="Skip the import time benchmark")
+    parser.add_argument("--recall", action="store_true", help="Run the quantized search recall benchmark")
+    parser.add_argument("--vector-dir", default="vectors", help="Local vector store to benchmark")
+    parser.add_argument("--num-vectors", type=int, default=20000, help="Synthetic vectors when no store exists")
+    parser.add_argument("--num-queries", type=int, default=200, help="Queries for the recall benchmark")
+    parser.add_argument("--rerank", type=int, default=50, help="Candidates re-ranked in full precision")
+    parser.add_argument("--recall-target", type=float, default=DEFAULT_RECALL_TARGET,
+                        help="Minimum recall@10 against exact search")
+    parser.add_argument("--routing", action="store_true", help="Check overview routing on example questions")
+    parser.add_argument("--chunking", action="store_true", help="Check layout chunking of the source PDFs")
+    parser.add_argument("--documents", default="documents.json", help="Pages whose source PDFs are checked")
+    parser.add_argument("--pdf-root", default=".", help="Directory the documents' source paths are relative to")
+
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    passed = True
+    if not args.skip_imports:
+        print(f"Import time (target {args.import_target * 1000:.0f} ms):")
+        passed = bench_imports(args.import_target, args.repeats) and passed
+    if args.recall:
+        print(f"Quantized search (target recall@10 {args.recall_target}):")
+        passed = bench_recall(args.vector_dir, args.num_vectors, args.num_queries, 10,
+                              args.rerank, args.recall_target) and passed
+    if args.routing:
+        print("Overview routing:")
+        passed = bench_routing() and passed
+    if args.chunking:
+        print("Layout chunking:")
+        passed = bench_chunking(args.documents, args.pdf_root) and passed
+    print(f"Finished in {time.perf_counter() - start:.1f}s")
+    sys.exit(0 if passed else 1)
@@ -0,0 +1,381 @@
+import os
+import re
+import logging
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Per document type: max characters per chunk, trailing units repeated in the next
+# chunk, and whether a row at the same margin starts a new record (tables, lists)
+# or continues the current paragraph (prose).
+CHUNK_PROFILES: Dict[str, dict] = {
+    "Financial Statement": {"max_chars": 3500, "overlap_units": 0, "records": True},
+    "Courses List": {"max_chars": 4000, "overlap_units": 0, "records": True},
+    "Strategic Plan": {"max_chars": 3000, "overlap_units": 1, "records": False},
+    "Government Mandate Letter": {"max_chars": 3000, "overlap_units": 1, "records": False},
+    "Unknown": {"max_chars": 2000, "overlap_units": 1, "records": False},
+}
+
+BULLET_PATTERN = re.compile(r"^\s*([•▪●◦\-–*]|\(?\d{1,3}[.)]|\(?[a-z][.)])\s+")
+BULLET_GLYPH = re.compile(r"^[•▪●◦\-–*]$")
+# A statement amount, year or note reference: "282,075", "(1,204)", "-", "11(a)"
+AMOUNT_PATTERN = re.compile(r"^(\(?-?[\d,.]+\)?|-|\d+\([a-z]\))$")
+CONTINUATION_ENDINGS = (",", "-", "–", "&", "/", "(", " and", " or", " of", " the")
+# Segments of one row further apart than this many average character widths are table cells
+CELL_GAP_CHARS = 2.0
+# Rows further apart than this many line heights start a new paragraph
+PARAGRAPH_GAP_LINES = 0.8
+# Column detection: a left edge needs this share of the page's lines, and positions
+# within COLUMN_TOLERANCE points count as the same edge
+COLUMN_MIN_LINE_SHARE = 0.1
+COLUMN_TOLERANCE = 5.0
+# A record line reaching this share of the right margin wrapped onto the next line
+WRAPPED_LINE_SHARE = 0.85
+
+
+def get_profile(doc_type: str) -> dict:
+    return CHUNK_PROFILES.get(doc_type, CHUNK_PROFILES["Unknown"])
+
+
+def _page_lines(page) -> List[dict]:
+    lines = []
+    for block in page.get_text("dict")["blocks"]:
+        if block.get("type") != 0:
+            continue
+        for line in block["lines"]:
+            text = "".join(span["text"] for span in line["spans"]).strip()
+            if text:
+                x0, y0, x1, y1 = line["bbox"]
+                lines.append({"text": text, "x0": x0, "x1": x1, "y0": y0, "y1": y1})
+    return lines
+
+
+def _column_starts(lines: List[dict]) -> List[float]:
+    """
+    Find the left edges of text columns.
+
+    A left edge shared by enough lines is a column start if the lines of the column
+    before it end short of it (an indented paragraph's lines do not).
+    """
+    counts: Dict[int, int] = {}
+    for line in lines:
+        edge = round(line["x0"] / 2) * 2
+        counts[edge] = counts.get(edge, 0) + 1
+    min_lines = max(3, COLUMN_MIN_LINE_SHARE * len(lines))
+    candidates = sorted(edge for edge, count in counts.items() if count >= min_lines)
+
+    starts: List[float] = candidates[:1]
+    for x in candidates[1:]:
+        if x - starts[-1] < COLUMN_TOLERANCE:
+            continue
+        previous = [l for l in lines if starts[-1] - COLUMN_TOLERANCE <= l["x0"] < x - COLUMN_TOLERANCE]
+        if sum(l["x1"] <= x + COLUMN_TOLERANCE for l in previous) >= 0.8 * len(previous):
+            starts.append(x)
+    return starts
+
+
+def _column_groups(lines: List[dict]) -> List[List[dict]]:
+    """
+    Split prose lines into columns and return them in reading order.
+
+    Lines that cross into the next column (titles, full-width paragraphs) separate the
+    page into bands; each band is read column by column, top to bottom.
+    """
+    starts = _column_starts(lines)
+    if len(starts) < 2:
+        return [lines]
+
+    def column_of(line):
+        index = max((i for i, x in enumerate(starts) if x <= line["x0"] + COLUMN_TOLERANCE), default=0)
+        if index + 1 < len(starts) and line["x1"] > starts[index + 1] + COLUMN_TOLERANCE:
+            return None
+        return index
+
+    groups: List[List[dict]] = []
+    band: Dict[int, List[dict]] = {}
+    for line in sorted(lines, key=lambda l: (l["y0"], l["x0"])):
+        column = column_of(line)
+        if column is None:
+            groups.extend(band[c] for c in sorted(band))
+            groups.append([line])
+            band = {}
+        else:
+            band.setdefault(column, []).append(line)
+    groups.extend(band[c] for c in sorted(band))
+    return groups
+
+
+def _rows(lines: List[dict], split_cells: bool) -> List[dict]:
+    """
+    Group lines into visual rows by vertical alignment.
+
+    With `split_cells`, lines that share a baseline (e.g. a statement label and its
+    amount columns) are joined with " | " between cells; a lone bullet glyph is not a
+    cell of its own. Otherwise (prose, where justified text leaves wide word gaps)
+    they are joined with spaces.
+    """
+    rows = []
+    for line in sorted(lines, key=lambda l: ((l["y0"] + l["y1"]) / 2, l["x0"])):
+        center = (line["y0"] + line["y1"]) / 2
+        height = line["y1"] - line["y0"]
+        row = rows[-1] if rows else None
+        if row and abs(center - row["center"]) <= 0.5 * min(height, row["height"]):
+            row["lines"].append(line)
+            row["y1"] = max(row["y1"], line["y1"])
+        else:
+            rows.append({"lines": [line], "center": center, "height": height, "y0": line["y0"], "y1": line["y1"]})
+
+    for row in rows:
+        cells = sorted(row["lines"], key=lambda l: l["x0"])
+        text = cells[0]["text"]
+        count = 1
+        for prev, cell in zip(cells, cells[1:]):
+            char_width = (prev["x1"] - prev["x0"]) / max(len(prev["text"]), 1)
+            if split_cells and cell["x0"] - prev["x1"] > CELL_GAP_CHARS * char_width and not BULLET_GLYPH.match(text):
+                text += " | "
+                count += 1
+            else:
+                text += " "
+            text += cell["text"]
+        row["text"] = text
+        row["x0"] = cells[0]["x0"]
+        row["x1"] = max(cell["x1"] for cell in cells)
+        row["cells"] = count
+    return rows
+
+
+def _continues(unit: dict, row: dict, records: bool, right_margin: float) -> bool:
+    """Whether `row` belongs to the record/paragraph `unit` instead of starting a new one."""
+    if BULLET_PATTERN.match(row["text"]) or unit["cells"] > 1 or row["cells"] > 1:
+        return False
+    gap = row["y0"] - unit["y1"]
+    if gap > PARAGRAPH_GAP_LINES * row["height"]:
+        return False
+
+    indent = row["x0"] - unit["x0"]
+    tolerance = 0.5 * row["height"]
+    if indent < -tolerance:
+        return False
+    if not records:
+        return True
+    # A bare amount (a side-table figure, a page number) is a record of its own unless
+    # it finishes a wrapped sentence ("... in fiscal" / "2025.")
+    if AMOUNT_PATTERN.match(unit["last_text"]):
+        return False
+    if AMOUNT_PATTERN.match(row["text"]):
+        return not unit["text"].rstrip().endswith((".", "!", "?", ":", ";"))
+    # Records (course entries, statement lines) wrap with a hanging indent after a
+    # full-width line, a lowercase start, or a dangling connective on the previous
+    # line; an indented row under a short line (a heading) is a record of its own
+    wrapped = unit["last_x1"] >= WRAPPED_LINE_SHARE * right_margin
+    return (
+        (indent > tolerance and wrapped)
+        or row["text"][:1].islower()
+        or unit["text"].rstrip().endswith(CONTINUATION_ENDINGS)
+    )
+
+
+def _continues_column(unit: dict, row: dict) -> bool:
+    """Whether the first row of a new column finishes the paragraph the last column ended in."""
+    return (
+        unit["cells"] == 1 and row["cells"] == 1
+        and row["text"][:1].islower()
+        and not unit["text"].rstrip().endswith((".", "!", "?", ":"))
+    )
+
+
+def layout_units(page, doc_type: str) -> List[str]:
+    """
+    Split a PyMuPDF page into indivisible units: table rows, list items, or paragraphs.
+
+    Record layouts (statements, course lists) are read as full-width rows so a label
+    stays with its amounts; prose is split into columns first so lines side by side
+    in different columns are never joined.
+
+    Parameters:
+        page (fitz.Page): The page to split.
+        doc_type (str): Document type label from `classify_document_type`.
+
+    Returns:
+        List[str]: Unit texts in reading order.
+    """
+    records = get_profile(doc_type)["records"]
+    lines = _page_lines(page)
+    groups = [lines] if records else _column_groups(lines)
+
+    units = []
+    for group in groups:
+        right_margin = max((l["x1"] for l in group), default=0)
+        first = len(units)
+        for row in _rows(group, split_cells=records):
+            unit = units[-1] if units else None
+            if unit is not None and (
+                _continues(unit, row, records, right_margin) if len(units) > first
+                else _continues_column(unit, row)
+            ):
+                unit["text"] += " " + row["text"]
+                unit["y1"] = row["y1"]
+                unit["cells"] = max(unit["cells"], row["cells"])
+                unit["last_x1"] = row["x1"]
+                unit["last_text"] = row["text"]
+            else:
+                units.append({**row, "last_x1": row["x1"], "last_text": row["text"]})
+    return [unit["text"] for unit in units]
+
+
+def text_units(text: str) -> List[str]:
+    """
+    Fallback units for text without layout: each line, with lowercase-start lines
+    joined to the previous one.
+    """
+    units = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if units and line[:1].islower():
+            units[-1] += " " + line
+        else:
+            units.append(line)
+    return units
+
+
+def pack_units(units: List[str], max_chars: int, overlap_units: int = 0) -> List[str]:
+    """
+    Greedily pack whole units into chunks of at most `max_chars`.
+
+    A single unit longer than `max_chars` becomes its own chunk, split at sentence
+    or word boundaries. Overlap units are only repeated if the next unit still fits.
+
+    Parameters:
+        units (List[str]): Unit texts in reading order.
+        max_chars (int): Target maximum chunk length.
+        overlap_units (int): Trailing units of a chunk repeated at the start of the next.
+
+    Returns:
+        List[str]: Chunk texts.
+    """
+    chunks = []
+    current: List[str] = []
+    size = 0
+    fresh = False  # whether `current` holds units not yet emitted
+
+    for unit in units:
+        if len(unit) > max_chars:
+            if fresh:
+                chunks.append("\n".join(current))
+            current, size, fresh = [], 0, False
+            chunks.extend(_split_long(unit, max_chars))
+            continue
+        if fresh and size + len(unit) + 1 > max_chars:
+            chunks.append("\n".join(current))
+            current = current[-overlap_units:] if overlap_units else []
+            # Overlap is dropped rather than letting it push the next chunk over the limit
+            while current and sum(len(u) + 1 for u in current) + len(unit) + 1 > max_chars:
+                current.pop(0)
+            size = sum(len(u) + 1 for u in current)
+        current.append(unit)
+        size += len(unit) + 1
+        fresh = True
+
+    if fresh:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def _split_long(text: str, max_chars: int) -> List[str]:
+    pieces = []
+    while len(text) > max_chars:
+        cut = text.rfind(". ", 0, max_chars)
+        cut = cut + 1 if cut > 0 else text.rfind(" ", 0, max_chars)
+        cut = cut if cut > 0 else max_chars
+        pieces.append(text[:cut].strip())
+        text = text[cut:].strip()
+    if text:
+        pieces.append(text)
+    return pieces
+
+
+class LayoutChunker:
+    """
+    Page-aware chunker that reads each source PDF once with PyMuPDF and falls back to
+    line-based units of the extracted text when the PDF (or PyMuPDF) is unavailable.
+
+    Units never span a page, but chunks pack units across consecutive pages of the
+    same document, so short pages (e.g. course lists) share one LLM call.
+    """
+
+    def __init__(self, pdf_root: str = "."):
+        self.pdf_root = pdf_root
+        self._open_path: Optional[str] = None
+        self._open_doc = None
+        try:
+            import fitz  # noqa: F401
+            self.layout_available = True
+        except ImportError:
+            logger.warning("PyMuPDF is not installed; chunking extracted text without layout.")
+            self.layout_available = False
+
+    def _resolve(self, source: str) -> str:
+        # Sources were recorded on Windows, e.g. ".\\BCIT\\BCIT Courses List.pdf"
+        parts = [p for p in re.split(r"[\\/]", source) if p and p != "."]
+        return os.path.join(self.pdf_root, *parts)
+
+    def _document(self, path: str):
+        if path != self._open_path:
+            self.close()
+            import fitz
+            self._open_doc = fitz.open(path)
+            self._open_path = path
+        return self._open_doc
+
+    def close(self):
+        if self._open_doc is not None:
+            self._open_doc.close()
+        self._open_doc = self._open_path = None
+
+    def page_units(self, text: str, metadata: dict) -> List[str]:
+        """
+        Split one page into units, from its PDF layout when available.
+
+        Parameters:
+            text (str): Extracted page text, used when the PDF layout cannot be read.
+            metadata (dict): Page metadata with `source`, `page` and `doc_type` or `source_file`.
+
+        Returns:
+            List[str]: Unit texts for the page.
+        """
+        doc_type = document_type(metadata)
+        path = self._resolve(metadata.get("source", ""))
+        if self.layout_available and os.path.isfile(path) and "page" in metadata:
+            try:
+                units = layout_units(self._document(path)[int(metadata["page"])], doc_type)
+                if units:
+                    return units
+            except Exception as e:
+                logger.warning(f"Layout chunking failed for {path} page {metadata['page']}: {e}")
+        return text_units(text)
+
+    def chunk_document(self, pages: List[Tuple[str, dict]]) -> List[str]:
+        """
+        Chunk consecutive pages of one document, packing whole units across page breaks.
+
+        Parameters:
+            pages (List[Tuple[str, dict]]): (page text, page metadata) pairs in page order.
+
+        Returns:
+            List[str]: Chunk texts sized by the document type's profile.
+        """
+        if not pages:
+            return []
+        profile = get_profile(document_type(pages[0][1]))
+        units = [unit for text, metadata in pages for unit in self.page_units(text, metadata)]
+        return pack_units(units, profile["max_chars"], profile["overlap_units"])
+
+
+def document_type(metadata: dict) -> str:
+    doc_type = metadata.get("doc_type")
+    if not doc_type:
+        from ingest import classify_document_type
+        doc_type = classify_document_type(metadata.get("source_file", ""))
+    return doc_type
@@ -0,0 +1,217 @@
+import re
+import time
+import uuid
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+from institutions import detect_institutions, requested_doc_types
+
+# Prior question/answer pairs sent back to the model, measured with `estimate_tokens`
+HISTORY_TOKEN_BUDGET = 1500
+# Questions from turns that no longer fit the budget, kept as a one-line summary that
+# counts against the budget and takes at most this share of it
+MAX_SUMMARY_QUESTIONS = 10
+SUMMARY_BUDGET_SHARE = 0.25
+SESSION_TTL_S = 60 * 60
+MAX_SESSIONS = 1000
+
+# Follow-ups that point back at the previous answer rather than asking something new
+ANAPHORIC_PATTERN = re.compile(
+    r"\b((about|on|of|by|explain|clarify|is|are|was|were) (this|that|these|those)|"
+    r"(this|that|these|those) (ones?|points?|items?|mean\w*)|"
+    r"the (first|second|third|last|above|previous) (ones?|points?|items?)|"
+    r"elaborate|expand on|say more|tell me more|more detail\w*|you (said|mentioned))\b",
+    re.IGNORECASE,
+)
+
+CONTEXT_PREFIX = "Based on the following information:"
+QUESTION_MARKER = "Answer this question:\n"
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English text with the OpenAI tokenizers
+    return len(text) // 4 + 1
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """
+    Cut `text` so that `estimate_tokens` of the result is at most `max_tokens`.
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    max_chars = (max_tokens - 1) * 4 - 1
+    return text[:max_chars].rstrip() + "…" if max_chars > 0 else ""
+
+
+def strip_context(content: str) -> str:
+    """
+    Reduce a user message built by `handle_query` back to the bare question.
+
+    Parameters:
+        content (str): Message content, possibly with a retrieved-context block.
+
+    Returns:
+        str: The question without its retrieved context.
+    """
+    if content.startswith(CONTEXT_PREFIX) and QUESTION_MARKER in content:
+        return content.rsplit(QUESTION_MARKER, 1)[1].strip()
+    return content
+
+
+class Conversation:
+    """
+    Server-side state of one multi-turn session.
+
+    Only each turn's question and answer are kept; retrieved context is dropped once
+    the turn is answered, except for the latest turn's matches, which a follow-up about
+    the previous answer itself ("Why is that a priority?") reuses instead of searching again.
+    """
+
+    def __init__(self, token_budget: int = HISTORY_TOKEN_BUDGET):
+        self.token_budget = token_budget
+        self.turns: List[dict] = []
+        self.earlier_questions: List[str] = []
+        self.last_matches = None
+        self.last_institutions: List[str] = []
+        self.last_doc_types: List[str] = []
+        self.last_used = time.monotonic()
+
+    def add_turn(self, question: str, answer: str, matches=None, institutions: List[str] = None):
+        self.turns.append({"question": question, "answer": answer})
+        self.last_matches = matches
+        # A follow-up that names no institution or topic stays on the previous ones
+        institutions = institutions if institutions is not None else detect_institutions(question)
+        self.last_institutions = institutions or self.last_institutions
+        self.last_doc_types = requested_doc_types(question) or self.last_doc_types
+        self.compact()
+
+    def seed_from_messages(self, messages: List[dict]):
+        """
+        Rebuild turns from a client-supplied chat history (alternating user/assistant messages).
+
+        Parameters:
+            messages (List[dict]): OpenAI-style {"role", "content"} messages.
+        """
+        question = None
+        for message in messages:
+            role, content = message.get("role"), message.get("content", "")
+            if role == "user":
+                question = strip_context(content)
+            elif role == "assistant" and question is not None:
+                self.turns.append({"question": question, "answer": content})
+                question = None
+        self.compact()
+
+    def summary(self) -> str:
+        """
+        Return the one-line summary of dropped turns, capped at its share of the budget.
+        """
+        if not self.earlier_questions:
+            return ""
+        text = "Earlier in this conversation the user asked: " + "; ".join(self.earlier_questions)
+        return truncate_tokens(text, int(self.token_budget * SUMMARY_BUDGET_SHARE))
+
+    def history_tokens(self) -> int:
+        summary = self.summary()
+        used = estimate_tokens(summary) if summary else 0
+        return used + sum(estimate_tokens(t["question"]) + estimate_tokens(t["answer"]) for t in self.turns)
+
+    def compact(self):
+        """
+        Keep the history, summary line included, within the token budget.
+
+        The oldest turns are dropped first, their questions folded into the summary;
+        the newest turn is always kept but truncated if it alone does not fit.
+        """
+        while len(self.turns) > 1 and self.history_tokens() > self.token_budget:
+            self.earlier_questions.append(self.turns.pop(0)["question"])
+            self.earlier_questions = self.earlier_questions[-MAX_SUMMARY_QUESTIONS:]
+
+        if self.turns and self.history_tokens() > self.token_budget:
+            summary = self.summary()
+            remaining = self.token_budget - (estimate_tokens(summary) if summary else 0)
+            turn = self.turns[-1]
+            turn["question"] = truncate_tokens(turn["question"], remaining // 4)
+            turn["answer"] = truncate_tokens(turn["answer"], remaining - estimate_tokens(turn["question"]))
+
+    def history_messages(self) -> List[dict]:
+        """
+        Return the compacted history as chat messages, oldest first.
+        """
+        messages = []
+        summary = self.summary()
+        if summary:
+            messages.append({"role": "system", "content": summary})
+        for turn in self.turns:
+            messages.append({"role": "user", "content": turn["question"]})
+            messages.append({"role": "assistant", "content": turn["answer"]})
+        return messages
+
+    def retrieval_query(self, question: str, institutions: List[str] = None) -> str:
+        """
+        Return the text to embed for `question`, naming the previous turn's institutions
+        when a follow-up only refers to them (e.g. "What about their revenue?").
+        """
+        institutions = institutions if institutions is not None else detect_institutions(question)
+        if institutions or not self.last_institutions:
+            return question
+        return f"{question} ({', '.join(self.last_institutions)})"
+
+    def reusable_matches(self, question: str, institutions: List[str] = None):
+        """
+        Return the previous turn's retrieval results if `question` is a follow-up on the
+        previous answer: it names no institution, refers back to that answer
+        (ANAPHORIC_PATTERN, e.g. "Can you explain that?") and asks about no document type
+        the previous turn did not. Any other question searches again.
+
+        Parameters:
+            question (str): The follow-up question.
+            institutions (List[str]): Institutions in `question`, if already detected.
+        """
+        if not self.last_matches:
+            return None
+        institutions = institutions if institutions is not None else detect_institutions(question)
+        if institutions or not ANAPHORIC_PATTERN.search(question):
+            return None
+        if not set(requested_doc_types(question)) <= set(self.last_doc_types):
+            return None
+        return self.last_matches
+
+
+class SessionStore:
+    """
+    In-process, thread-safe map of session IDs to conversations with LRU + idle-time eviction.
+    """
+
+    def __init__(self, ttl_s: float = SESSION_TTL_S, max_sessions: int = MAX_SESSIONS):
+        self.ttl_s = ttl_s
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, Conversation]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_create(self, session_id: Optional[str] = None):
+        """
+        Return (session_id, conversation), starting a new session under a fresh ID if
+        the given ID is unknown or expired.
+
+        Parameters:
+            session_id (Optional[str]): ID returned by a previous call, if any.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._evict(now)
+            conversation = self._sessions.get(session_id) if session_id else None
+            if conversation is None:
+                # Always a server-issued ID: clients cannot choose their own
+                session_id = uuid.uuid4().hex
+                conversation = self._sessions[session_id] = Conversation()
+            self._sessions.move_to_end(session_id)
+            conversation.last_used = now
+            return session_id, conversation
+
+    def _evict(self, now: float):
+        while self._sessions:
+            oldest_id, oldest = next(iter(self._sessions.items()))
+            if len(self._sessions) < self.max_sessions and now - oldest.last_used < self.ttl_s:
+                break
+            del self._sessions[oldest_id]
@@ -1,37 +1,28 @@
 import os
-import json
-import uuid
 from tqdm import tqdm
-from dotenv import load_dotenv
-import openai
-from openai import OpenAI
-from pinecone import Pinecone, ServerlessSpec
+import resources
 
-# Load environment variables
-load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+def ensure_index():
+    from pinecone import ServerlessSpec
 
-# Initialize Pinecone client
-pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
+    pc = resources.pinecone_client()
+    index_name = os.getenv("PINECONE_INDEX_NAME")
+    env = os.getenv("PINECONE_ENV")
 
-index_name = os.getenv("PINECONE_INDEX_NAME")
-env = os.getenv("PINECONE_ENV") 
-
-# Create index if it doesn't exist
-if index_name not in [index.name for index in pc.list_indexes()]:
-    print("Index Name:", index_name)
-    pc.create_index(
-        name=index_name,
-        dimension=1536,
-        metric="cosine",
-        spec=ServerlessSpec(cloud="aws", region=env)  # Adjust cloud & region as needed
-    )
-
-index = pc.Index(index_name)
+    # Create index if it doesn't exist
+    if index_name not in [index.name for index in pc.list_indexes()]:
+        print("Index Name:", index_name)
+        pc.create_index(
+            name=index_name,
+            dimension=resources.EMBEDDING_DIMENSION,
+            metric="cosine",
+            spec=ServerlessSpec(cloud="aws", region=env)  # Adjust cloud & region as needed
+        )
+        resources.reset("pinecone_index")
 
 def embed_text(text: str) -> list[float]:
-    response = client.embeddings.create(
-        model="text-embedding-3-small",
+    response = resources.openai_client().embeddings.create(
+        model=resources.EMBEDDING_MODEL,
         input=[text]
     )
     return response.data[0].embedding
@@ -39,43 +30,56 @@ def embed_text(text: str) -> list[float]:
 def build_text_from_triple(triple: dict) -> str:
     return f"{triple['subject']} {triple['predicate']} {triple['object']}"
 
-def load_triples(filepath: str) -> list[dict]:
-    with open(filepath, "r", encoding="utf-8") as f:
-        return [json.loads(line) for line in f if line.strip()]
-
 def store_to_pinecone(vectors: list[dict]):
+    index = resources.pinecone_index()
     batch_size = 100
     for i in range(0, len(vectors), batch_size):
         index.upsert(vectors[i:i + batch_size])
 
-def main():
-    triples = load_triples("triples.jsonl")
-    pinecone_vectors = []
+def store_locally(vectors: list[dict], store):
+    import numpy as np
+    from vector_store import LocalVectorStore
+
+    # Rows must line up with triple store row IDs; triples that failed to embed stay zero
+    matrix = np.zeros((len(store), resources.EMBEDDING_DIMENSION), dtype=np.float32)
+    for vector in vectors:
+        matrix[int(vector["id"])] = vector["values"]
+    LocalVectorStore.from_vectors(matrix).save(resources.VECTOR_DIR, len(store), store.fingerprint())
 
-    for triple in tqdm(triples, desc="Embedding Triples"):
+def main(backend: str = "pinecone"):
+    if backend == "pinecone":
+        ensure_index()
+    store = resources.triple_store()
+    vectors = []
+
+    for row_id in tqdm(range(len(store)), desc="Embedding Triples"):
+        triple = store[row_id]
         try:
             triple_text = build_text_from_triple(triple)
             embedding = embed_text(triple_text)
-            vector_id = str(uuid.uuid4())
-
-            metadata = {
-                "subject": str(triple["subject"]),
-                "predicate": str(triple["predicate"]),
-                "object": str(triple["object"]),
-                "institution": str(triple.get("institution", "Unknown")),
-                "source": str(triple.get("source", "Unknown"))
-            }
 
-            pinecone_vectors.append({
-                "id": vector_id,
+            # Vector IDs are triple store row IDs, so re-runs overwrite instead of duplicating
+            vectors.append({
+                "id": str(row_id),
                 "values": embedding,
-                "metadata": metadata
+                "metadata": triple
             })
         except Exception as e:
             print(f"Failed to embed triple: {triple}. Error: {e}")
 
-    store_to_pinecone(pinecone_vectors)
-    print(f"Stored {len(pinecone_vectors)} triples to Pinecone.")
+    if backend == "local":
+        store_locally(vectors, store)
+        print(f"Stored {len(vectors)} triples to {resources.VECTOR_DIR}/.")
+    else:
+        store_to_pinecone(vectors)
+        print(f"Stored {len(vectors)} triples to Pinecone.")
 
 if __name__ == "__main__":
-    main()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Embed triples and store them for semantic search.")
+    parser.add_argument("--backend", choices=["pinecone", "local"], default=resources.VECTOR_BACKEND,
+                        help="Store vectors in Pinecone or in the local int8 vector store")
+
+    args = parser.parse_args()
+    main(args.backend)
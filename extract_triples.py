@@ -2,46 +2,15 @@ import os
 import json
 import logging
 from typing import List, Dict
-import spacy
-from langchain.schema import Document
-from langchain.chat_models import ChatOpenAI
-from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
-from langchain.text_splitter import CharacterTextSplitter
-from dotenv import load_dotenv
 from tqdm import tqdm
 from datetime import datetime
+import resources
+from chunker import LayoutChunker
 
-# Load environment variables from .env
-load_dotenv()
-
-# Setup logging
-log_filename = f"llm_extraction_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(levelname)s: %(message)s",
-    handlers=[
-        logging.FileHandler(log_filename, mode="w", encoding="utf-8"),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
-logger.info(f"LLM input/output logs will be saved to: {log_filename}")
-
-# Load spaCy model
-nlp = spacy.load("en_core_web_sm")
-
-# Setup LLM
-llm = ChatOpenAI(
-    model_name="gpt-3.5-turbo",
-    temperature=0,
-    openai_api_key=os.getenv("OPENAI_API_KEY")
-)
 
 # Prompt for extracting triples
-triplet_prompt = PromptTemplate(
-    input_variables=["text"],
-    template="""
+TRIPLET_TEMPLATE = """
 Extract all subject–predicate–object relationships from the following text.
 
 Return a list of JSON objects in this exact format:
@@ -55,18 +24,47 @@ Text:
 
 Triples:
 """
-)
-triplet_chain = LLMChain(llm=llm, prompt=triplet_prompt)
 
-# Text splitter
-text_splitter = CharacterTextSplitter(
-    chunk_size=1000,
-    chunk_overlap=100
-)
+
+def setup_logging() -> str:
+    """
+    Configure file + console logging for an extraction run.
+
+    Returns:
+        str: Path of the log file that LLM inputs/outputs are written to.
+    """
+    log_filename = f"llm_extraction_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(levelname)s: %(message)s",
+        handlers=[
+            logging.FileHandler(log_filename, mode="w", encoding="utf-8"),
+            logging.StreamHandler()
+        ]
+    )
+    logger.info(f"LLM input/output logs will be saved to: {log_filename}")
+    return log_filename
+
+
+def _build_triplet_chain():
+    from langchain.chat_models import ChatOpenAI
+    from langchain.prompts import PromptTemplate
+    from langchain.chains import LLMChain
+
+    llm = ChatOpenAI(
+        model_name=resources.CHAT_MODEL,
+        temperature=0,
+        openai_api_key=os.getenv("OPENAI_API_KEY")
+    )
+    triplet_prompt = PromptTemplate(input_variables=["text"], template=TRIPLET_TEMPLATE)
+    return LLMChain(llm=llm, prompt=triplet_prompt)
+
+
+resources.register("triplet_chain", _build_triplet_chain)
 
 def extract_triples(text: str) -> List[Dict[str, str]]:
     try:
-        response = triplet_chain.run(text=text).strip()
+        response = resources.get("triplet_chain").run(text=text).strip()
         logger.info("\n=== CHUNK START ===\n%s\n--- LLM Response ---\n%s\n=== CHUNK END ===\n", text, response)
 
         parsed = json.loads(response)
@@ -86,7 +84,30 @@ def extract_triples(text: str) -> List[Dict[str, str]]:
 
     return []
 
-def process_documents(input_path: str, output_path: str):
+def group_pages_by_source(documents: list) -> List[List[tuple]]:
+    """
+    Group consecutive pages of the same source PDF, skipping empty/short pages.
+
+    Parameters:
+        documents (list): LangChain documents, one per page, in page order.
+
+    Returns:
+        List[List[tuple]]: (page text, page metadata) pairs per document.
+    """
+    groups = []
+    for doc in documents:
+        text = doc.page_content.strip()
+        if not text or len(text) < 100:
+            continue
+        if groups and groups[-1][0][1].get("source") == doc.metadata.get("source"):
+            groups[-1].append((text, doc.metadata))
+        else:
+            groups.append([(text, doc.metadata)])
+    return groups
+
+def process_documents(input_path: str, output_path: str, pdf_root: str = "."):
+    from langchain.schema import Document
+
     if not os.path.exists(input_path):
         logger.error(f"Input file does not exist: {input_path}")
         return
@@ -96,22 +117,22 @@ def process_documents(input_path: str, output_path: str):
 
     documents = [Document(page_content=item["content"], metadata=item["metadata"]) for item in raw_data]
     all_triples = []
+    chunker = LayoutChunker(pdf_root)
 
-    for i, doc in enumerate(tqdm(documents, desc="Extracting Triples")):
-        text = doc.page_content.strip()
-        if not text or len(text) < 100:
-            continue
-
-        chunks = text_splitter.split_text(text)
-        logger.info(f"Processing page {i + 1}/{len(documents)} with {len(chunks)} chunks")
+    for pages in tqdm(group_pages_by_source(documents), desc="Extracting Triples"):
+        metadata = pages[0][1]
+        chunks = chunker.chunk_document(pages)
+        logger.info(f"Processing {metadata.get('source_file', 'Unknown')} ({len(pages)} pages) with {len(chunks)} chunks")
 
         for chunk in chunks:
             triples = extract_triples(chunk)
             for triple in triples:
-                triple["institution"] = doc.metadata.get("institution", "Unknown")
-                triple["source"] = doc.metadata.get("source_file", "Unknown")
+                triple["institution"] = metadata.get("institution", "Unknown")
+                triple["source"] = metadata.get("source_file", "Unknown")
                 all_triples.append(triple)
 
+    chunker.close()
+
     # Deduplicate triples
     unique_triples = [dict(t) for t in {tuple(sorted(d.items())) for d in all_triples}]
 
@@ -127,6 +148,8 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Extract relationship triples from documents.json")
     parser.add_argument("--input", default="documents.json", help="Path to the input documents.json")
     parser.add_argument("--output", default="triples.jsonl", help="Path to output triples file (.jsonl)")
+    parser.add_argument("--pdf-root", default=".", help="Root folder the documents' source PDFs are relative to")
 
     args = parser.parse_args()
-    process_documents(args.input, args.output)
+    setup_logging()
+    process_documents(args.input, args.output, args.pdf_root)
@@ -0,0 +1,82 @@
+import re
+from typing import Dict, List
+
+# Canonical names match the institution folders / `institution` metadata values
+INSTITUTION_ALIASES: Dict[str, List[str]] = {
+    "BCIT": ["BCIT", "British Columbia Institute of Technology"],
+    "Camosun College": ["Camosun"],
+    "Douglas College": ["Douglas College", "Douglas"],
+    "Langara College": ["Langara"],
+    "RRU": ["RRU", "Royal Roads"],
+    "SFU": ["SFU", "Simon Fraser"],
+    "Selkirk College": ["Selkirk"],
+    "TRU": ["TRU", "Thompson Rivers"],
+    "UBC": ["UBC", "University of British Columbia"],
+    "UVic": ["UVic", "University of Victoria"],
+}
+
+# Question keywords that point at one document type
+DOC_TYPE_KEYWORDS: Dict[str, str] = {
+    "Strategic Plan": r"strateg\w*|priorit\w*|vision|mission|goals?|plan",
+    "Financial Statement": r"financ\w*|revenue|expen\w*|budget|deficit|surplus|assets?|debt",
+    "Government Mandate Letter": r"mandate|government|ministry|province",
+    "Courses List": r"courses?|programs?|programmes?|credentials?|degrees?|diplomas?",
+}
+
+_ALIAS_PATTERNS = {
+    name: re.compile(r"\b(" + "|".join(re.escape(a) for a in aliases) + r")\b", re.IGNORECASE)
+    for name, aliases in INSTITUTION_ALIASES.items()
+}
+
+
+def detect_institutions(text: str) -> List[str]:
+    """
+    Find the institutions mentioned in free text.
+
+    Parameters:
+        text (str): A question or answer.
+
+    Returns:
+        List[str]: Canonical institution names, in INSTITUTION_ALIASES order.
+    """
+    return [name for name, pattern in _ALIAS_PATTERNS.items() if pattern.search(text)]
+
+
+def remove_institutions(text: str) -> str:
+    """
+    Blank out every institution name in free text, e.g. to see what a question asks
+    about besides the institutions it names.
+    """
+    for pattern in _ALIAS_PATTERNS.values():
+        text = pattern.sub(" ", text)
+    return text
+
+
+def canonical_institution(name: str) -> str:
+    """
+    Map an `institution` metadata value (e.g. "University of Victoria (UVic)") to its canonical name.
+
+    Parameters:
+        name (str): Institution name as written in the triples.
+
+    Returns:
+        str: The canonical name, or `name` unchanged if it matches none or several.
+    """
+    matches = detect_institutions(name)
+    return matches[0] if len(matches) == 1 else name
+
+
+def requested_doc_types(question: str) -> List[str]:
+    """
+    Find the document types a question asks about, from DOC_TYPE_KEYWORDS.
+
+    Parameters:
+        question (str): A user question.
+
+    Returns:
+        List[str]: Document types, in DOC_TYPE_KEYWORDS order.
+    """
+    return [
+        doc_type for doc_type, pattern in DOC_TYPE_KEYWORDS.items()
+        if re.search(rf"\b({pattern})\b", question, re.IGNORECASE)
+    ]
@@ -1,36 +1,55 @@
-import os
-from dotenv import load_dotenv
-from pinecone import Pinecone
-from openai import OpenAI
-
-load_dotenv()
-client = OpenAI()
-
-pinecone_api_key = os.getenv("PINECONE_API_KEY")
-pinecone_index_name = os.getenv("PINECONE_INDEX_NAME")
-
-pc = Pinecone(api_key=pinecone_api_key)
-index = pc.Index(pinecone_index_name)
+import resources
+from conversation import Conversation, CONTEXT_PREFIX, QUESTION_MARKER
+from institutions import detect_institutions
+from summaries import route_overview
 
 def get_query_embedding(query: str) -> list[float]:
-    response = client.embeddings.create(
+    response = resources.openai_client().embeddings.create(
         input=[query],
-        model="text-embedding-3-small"
+        model=resources.EMBEDDING_MODEL
     )
     return response.data[0].embedding
 
 def search_pinecone(embedding: list[float], top_k=10):
-    results = index.query(
+    results = resources.pinecone_index().query(
         vector=embedding,
         top_k=top_k,
         include_metadata=True
     )
     return results['matches']
 
+def search_local(embedding: list[float], top_k=10):
+    # Same shape as Pinecone matches; metadata is resolved from the triple store by row ID
+    return [
+        {"id": str(row_id), "score": score, "metadata": resources.triple_store()[row_id]}
+        for row_id, score in resources.vector_store().search(embedding, top_k=top_k)
+    ]
+
+def search_vectors(embedding: list[float], top_k=10):
+    if resources.VECTOR_BACKEND == "local":
+        return search_local(embedding, top_k)
+    return search_pinecone(embedding, top_k)
+
+def match_metadata(match) -> dict:
+    """
+    Return a match's triple metadata, falling back to the local triple store
+    (by row ID) for vectors upserted without metadata.
+    """
+    try:
+        meta = match['metadata']
+    except KeyError:
+        meta = None
+    if meta:
+        return meta
+    try:
+        return resources.triple_store()[int(match['id'])]
+    except (ValueError, IndexError):
+        return {}
+
 def format_context(matches):
     context = ""
     for m in matches:
-        meta = m['metadata']
+        meta = match_metadata(m)
         triple = f"{meta['subject']} {meta['predicate']} {meta['object']}"
         source = meta.get('source', 'Unknown source')
         institution = meta.get('institution', 'Unknown institution')
@@ -38,8 +57,8 @@ def format_context(matches):
     return context
 
 def ask_openai(question: str, context: str) -> str:
-    response = client.chat.completions.create(
-        model="gpt-3.5-turbo",
+    response = resources.openai_client().chat.completions.create(
+        model=resources.CHAT_MODEL,
         messages=[
             {
                 "role": "system",
@@ -63,20 +82,54 @@ def ask_openai(question: str, context: str) -> str:
     )
     return response.choices[0].message.content.strip()
 
-def handle_query(user_query: str, history: list = None):
-    query_embedding = get_query_embedding(user_query)
-    matches = search_pinecone(query_embedding)
+def handle_query(user_query: str, history: list = None, conversation: Conversation = None):
+    if conversation is None:
+        # Stateless call: compact a copy of the client-supplied history
+        conversation = Conversation()
+        conversation.seed_from_messages(history or [])
+
+    institutions = detect_institutions(user_query)
 
-    context = format_context(matches)
+    # Overview questions are answered from precomputed digests, skipping retrieval
+    digests = route_overview(user_query, resources.summary_index())
+    if digests:
+        return answer_from_digests(user_query, digests, conversation, institutions)
+
+    matches = conversation.reusable_matches(user_query, institutions)
+    if matches is None:
+        query_embedding = get_query_embedding(conversation.retrieval_query(user_query, institutions))
+        matches = search_vectors(query_embedding)
+
+    answer = generate_answer(user_query, format_context(matches), conversation)
+    conversation.add_turn(user_query, answer, matches, institutions)
+
+    return {
+        "answer": answer,
+        "sources": list({meta.get("source", "Unknown") + " (" + meta.get("institution", "") + ")" for meta in map(match_metadata, matches)})
+    }
 
-    messages = history if history else []
+def format_digests(digests: list) -> str:
+    return "".join(f"- {d['institution']} {d['doc_type']} digest:\n{d['digest']}\n" for d in digests)
+
+def answer_from_digests(user_query: str, digests: list, conversation: Conversation, institutions: list):
+    # One short generation over the digests answers the question as asked, with the history
+    answer = generate_answer(user_query, format_digests(digests), conversation)
+    conversation.add_turn(user_query, answer, None, institutions)
+
+    return {
+        "answer": answer,
+        "sources": list({f"{source} ({d['institution']})" for d in digests for source in d["sources"]})
+    }
+
+def generate_answer(user_query: str, context: str, conversation: Conversation) -> str:
+    messages = conversation.history_messages()
     messages.append({
         "role": "user",
-        "content": f"Based on the following information:\n\n{context}\n\nAnswer this question:\n{user_query}"
+        "content": f"{CONTEXT_PREFIX}\n\n{context}\n\n{QUESTION_MARKER}{user_query}"
     })
 
-    response = client.chat.completions.create(
-        model="gpt-3.5-turbo",
+    response = resources.openai_client().chat.completions.create(
+        model=resources.CHAT_MODEL,
         messages=[
             {
                 "role": "system",
@@ -86,15 +139,12 @@ def handle_query(user_query: str, history: list = None):
         ],
         temperature=0.2
     )
-
-    return {
-        "answer": response.choices[0].message.content.strip(),
-        "sources": list({m["metadata"].get("source", "Unknown") + " (" + m["metadata"].get("institution", "") + ")" for m in matches})
-    }
+    return response.choices[0].message.content.strip()
 
 
 def main():
     print("Ask your question about any of the ten post-secondary institutions (type 'exit' to quit):\n")
+    conversation = Conversation()
     while True:
         user_query = input(" Question: ").strip()
         if user_query.lower() in ["exit", "quit"]:
@@ -102,7 +152,7 @@ def main():
             break
 
         print("Processing...")
-        result = handle_query(user_query)
+        result = handle_query(user_query, conversation=conversation)
         print("\n Answer:")
         print(result["answer"] + "\n")
 
@@ -1,31 +1,14 @@
-import os
-import openai
-from dotenv import load_dotenv
-from pinecone import Pinecone
-from openai import OpenAI
-from tqdm import tqdm
-
-# Load environment variables
-load_dotenv()
-openai.api_key = os.getenv("OPENAI_API_KEY")
-pinecone_api_key = os.getenv("PINECONE_API_KEY")
-pinecone_index_name = os.getenv("PINECONE_INDEX_NAME")
-
-# Initialize Pinecone
-pc = Pinecone(api_key=pinecone_api_key)
-index = pc.Index(pinecone_index_name)
-
-client = OpenAI()
+import resources
 
 def get_query_embedding(query: str) -> list[float]:
-    response = client.embeddings.create(
+    response = resources.openai_client().embeddings.create(
         input=[query],
-        model="text-embedding-3-small"
+        model=resources.EMBEDDING_MODEL
     )
     return response.data[0].embedding
 
 def search_pinecone(embedding: list[float], top_k=10):
-    results = index.query(
+    results = resources.pinecone_index().query(
         vector=embedding,
         top_k=top_k,
         include_metadata=True
@@ -64,8 +47,8 @@ def ask_openai(question: str, context: str) -> str:
         }
     ]
     
-    response = client.chat.completions.create(
-        model="gpt-3.5-turbo",
+    response = resources.openai_client().chat.completions.create(
+        model=resources.CHAT_MODEL,
         messages=messages,
         temperature=0.2
     )
@@ -0,0 +1,165 @@
+import os
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable
+from dotenv import load_dotenv
+
+# Load environment variables once for every script that shares these clients
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_DIMENSION = 1536
+CHAT_MODEL = "gpt-3.5-turbo"
+TRIPLES_JSONL = "triples.jsonl"
+TRIPLES_STORE = "triples.bin"
+VECTOR_DIR = "vectors"
+SUMMARY_INDEX = "summaries.json"
+# "pinecone" (hosted index) or "local" (int8 vector store in VECTOR_DIR)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "pinecone")
+
+_factories: Dict[str, Callable[[], Any]] = {}
+_instances: Dict[str, Any] = {}
+# Re-entrant: factories may `get` the resources they depend on
+_lock = threading.RLock()
+
+
+def register(name: str, factory: Callable[[], Any]):
+    """
+    Register a zero-argument factory that builds a shared resource on first use.
+
+    Parameters:
+        name (str): Key the resource is looked up by.
+        factory (Callable[[], Any]): Builds the resource. Heavy imports belong inside it.
+    """
+    with _lock:
+        _factories[name] = factory
+        _instances.pop(name, None)
+
+
+def get(name: str) -> Any:
+    """
+    Return the shared resource for `name`, building it on the first call.
+
+    Parameters:
+        name (str): Key used when the resource was registered.
+
+    Returns:
+        Any: The cached resource instance.
+    """
+    instance = _instances.get(name)
+    if instance is not None:
+        return instance
+
+    with _lock:
+        if name not in _instances:
+            if name not in _factories:
+                raise KeyError(f"No resource registered under '{name}'")
+            start = time.perf_counter()
+            _instances[name] = _factories[name]()
+            logger.info(f"Initialized resource '{name}' in {time.perf_counter() - start:.2f}s")
+        return _instances[name]
+
+
+def reset(name: str = None):
+    """
+    Drop cached instances so the next `get` rebuilds them.
+
+    Parameters:
+        name (str): Resource to drop. Drops every resource when omitted.
+    """
+    with _lock:
+        if name is None:
+            _instances.clear()
+        else:
+            _instances.pop(name, None)
+
+
+def warm_up(names: Iterable[str]) -> Dict[str, bool]:
+    """
+    Eagerly build the given resources, e.g. from a server startup hook.
+
+    Failures are logged rather than raised so the caller can still start;
+    the resource is retried lazily on its next `get`.
+
+    Parameters:
+        names (Iterable[str]): Resources to initialize.
+
+    Returns:
+        Dict[str, bool]: Whether each resource initialized successfully.
+    """
+    status = {}
+    for name in names:
+        try:
+            get(name)
+            status[name] = True
+        except Exception as e:
+            logger.warning(f"Warm-up of resource '{name}' failed: {e}")
+            status[name] = False
+    return status
+
+
+def _build_openai_client():
+    from openai import OpenAI
+    return OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+
+def _build_pinecone_client():
+    from pinecone import Pinecone
+    return Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
+
+
+def _build_pinecone_index():
+    return get("pinecone").Index(os.getenv("PINECONE_INDEX_NAME"))
+
+
+def _build_triple_store():
+    from triple_store import load_or_build
+    return load_or_build(TRIPLES_JSONL, TRIPLES_STORE)
+
+
+def _build_vector_store():
+    from vector_store import LocalVectorStore
+    store = LocalVectorStore.load(VECTOR_DIR)
+    triples = get("triple_store")
+    store.check_triples(len(triples), triples.fingerprint())
+    return store
+
+
+def _build_summary_index():
+    from summaries import load_index
+    return load_index(SUMMARY_INDEX)
+
+
+register("openai", _build_openai_client)
+register("pinecone", _build_pinecone_client)
+register("pinecone_index", _build_pinecone_index)
+register("triple_store", _build_triple_store)
+register("vector_store", _build_vector_store)
+register("summary_index", _build_summary_index)
+
+
+def openai_client():
+    return get("openai")
+
+
+def pinecone_client():
+    return get("pinecone")
+
+
+def pinecone_index():
+    return get("pinecone_index")
+
+
+def triple_store():
+    return get("triple_store")
+
+
+def vector_store():
+    return get("vector_store")
+
+
+def summary_index():
+    return get("summary_index")
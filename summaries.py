@@ -0,0 +1,268 @@
+import os
+import re
+import json
+import hashlib
+import logging
+from collections import defaultdict
+from typing import Dict, List, Optional
+import resources
+from institutions import (DOC_TYPE_KEYWORDS, canonical_institution, detect_institutions, remove_institutions,
+                          requested_doc_types)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SUMMARY_INDEX = resources.SUMMARY_INDEX
+DEFAULT_METADATA = "pdf_metadata.json"
+# Triples per digest prompt; larger groups keep the first ones in store order
+MAX_DIGEST_TRIPLES = 400
+# Digests built from fewer triples are too thin to answer from; such questions use retrieval
+MIN_DIGEST_TRIPLES = 20
+
+OVERVIEW_PATTERN = re.compile(
+    r"\b(overview|summar\w*|priorit\w*|strateg\w*|focus\w*|goals?|themes?|highlights?|"
+    r"tell me about|key (points|areas|initiatives)|what does .* (do|offer))\b",
+    re.IGNORECASE,
+)
+# Questions that ask for the gist of one document type even without a generic cue above
+DOC_TYPE_OVERVIEW_CUES = {
+    "Strategic Plan": r"strategic plan|vision|mission",
+    "Financial Statement": r"financial (statements?|position|health|situation|picture)",
+    "Government Mandate Letter": r"mandate( letter)?",
+    "Courses List": r"(programs?|programmes?|courses?|credentials?|degrees?|diplomas?)\b.*\b(offer\w*|available|are there)|"
+                    r"(list|kinds?|types?) of (programs?|programmes?|courses?|credentials?)",
+}
+# Questions after specific figures or facts still need triple-level retrieval
+DETAIL_PATTERN = re.compile(r"\b(how much|how many|exact\w*|amount|total|percent\w*)\b|\$|%", re.IGNORECASE)
+# Words an overview question may consist of besides institution names and DOC_TYPE_KEYWORDS;
+# any other word ("housing", "nursing", "signed") is a topic the digest may not cover
+OVERVIEW_WORDS = re.compile(
+    r"a|an|the|of|for|in|on|at|to|and|me|us|s|what|whats|is|are|does|do|its|their|please|can|could|you|"
+    r"give|tell|about|provide|describe|compare|comparison|between|brief\w*|quick|short|general|main|key|top|"
+    r"overall|big|picture|points|areas|initiatives|overview|summar\w*|focus\w*|themes?|highlights?|"
+    r"letter|statements?|position|health|situation|offer\w*|available|there|list|kinds?|types?|"
+    r"college|university|institute"
+)
+
+# Expected `route_overview` results (digest document types, or None for full retrieval)
+# against an index holding every document type; checked by `benchmark.py --routing`
+ROUTING_EXAMPLES = [
+    ("What are Douglas College's strategic priorities?", ["Strategic Plan"]),
+    ("What programs does Douglas College offer?", ["Courses List"]),
+    ("Summarize Douglas College's mandate letter", ["Government Mandate Letter"]),
+    ("What is in UBC's mandate letter?", ["Government Mandate Letter"]),
+    ("Give me an overview of SFU's financial position", ["Financial Statement"]),
+    ("Tell me about Langara", list(DOC_TYPE_KEYWORDS)),
+    ("Compare the strategic priorities of UBC and SFU", ["Strategic Plan", "Strategic Plan"]),
+    ("How much revenue did Douglas College report in 2024?", None),
+    ("How many programs does BCIT offer?", None),
+    ("What are the strategic priorities of BC colleges?", None),
+    ("Does UBC run a co-op office?", None),
+    ("Who signed UBC's mandate letter?", None),
+    ("Does UBC's mandate letter mention housing?", None),
+    ("What does the mandate letter ask UBC to do about tuition?", None),
+    ("Which nursing programs does UBC offer?", None),
+    ("Is a computer science degree offered at SFU?", None),
+    ("When does Douglas College's strategic plan end?", None),
+    ("What are UBC's goals for student housing?", None),
+    ("What does UBC do to support Indigenous students?", None),
+]
+
+DIGEST_PROMPT = (
+    "Write a concise digest (at most 200 words) of {institution}'s {doc_type} using only these "
+    "facts extracted from the document. Lead with the main priorities or themes, keep key figures, "
+    "and do not mention other institutions.\n\nFacts:\n{facts}"
+)
+
+
+def load_doc_types(metadata_path: str = DEFAULT_METADATA) -> Dict[str, str]:
+    """
+    Map each source file name to its document type.
+
+    Parameters:
+        metadata_path (str): Path to pdf_metadata.json.
+
+    Returns:
+        Dict[str, str]: source_file -> doc_type.
+    """
+    if not os.path.exists(metadata_path):
+        return {}
+    with open(metadata_path, "r", encoding="utf-8") as f:
+        return {m["source_file"]: m["doc_type"] for m in json.load(f) if "source_file" in m and "doc_type" in m}
+
+
+def group_triples(store, doc_types: Dict[str, str]) -> Dict[str, Dict[str, List[dict]]]:
+    """
+    Group triples by canonical institution, then by document type.
+    """
+    groups: Dict[str, Dict[str, List[dict]]] = defaultdict(lambda: defaultdict(list))
+    for triple in store:
+        institution = canonical_institution(triple["institution"])
+        doc_type = doc_types.get(triple["source"])
+        if doc_type is None:
+            from ingest import classify_document_type
+            doc_type = doc_types[triple["source"]] = classify_document_type(triple["source"])
+        groups[institution][doc_type].append(triple)
+    return groups
+
+
+def fingerprint(triples_by_type: Dict[str, List[dict]]) -> str:
+    lines = sorted(json.dumps(t, sort_keys=True) for triples in triples_by_type.values() for t in triples)
+    return hashlib.sha256("\n".join(lines).encode("utf-8")).hexdigest()
+
+
+def write_digest(institution: str, doc_type: str, triples: List[dict]) -> str:
+    facts = "\n".join(f"- {t['subject']} {t['predicate']} {t['object']}" for t in triples[:MAX_DIGEST_TRIPLES])
+    response = resources.openai_client().chat.completions.create(
+        model=resources.CHAT_MODEL,
+        messages=[{
+            "role": "user",
+            "content": DIGEST_PROMPT.format(institution=institution, doc_type=doc_type, facts=facts)
+        }],
+        temperature=0.2
+    )
+    return response.choices[0].message.content.strip()
+
+
+def load_index(index_path: str = DEFAULT_SUMMARY_INDEX) -> dict:
+    if not os.path.exists(index_path):
+        return {"institutions": {}}
+    with open(index_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def build_index(index_path: str = DEFAULT_SUMMARY_INDEX, metadata_path: str = DEFAULT_METADATA,
+                force: bool = False) -> dict:
+    """
+    Build or refresh the per-institution, per-document-type digest index.
+
+    An institution's digests are regenerated only when its triples changed since
+    the last build (compared by fingerprint), or when `force` is set. The index is
+    saved after each institution, so a rerun after a failure resumes where it stopped.
+
+    Parameters:
+        index_path (str): Where the index JSON is stored.
+        metadata_path (str): pdf_metadata.json, for source file -> document type.
+        force (bool): Regenerate every digest.
+
+    Returns:
+        dict: The updated index.
+    """
+    previous = load_index(index_path).get("institutions", {})
+    groups = group_triples(resources.triple_store(), load_doc_types(metadata_path))
+
+    institutions = {}
+    for institution, triples_by_type in sorted(groups.items()):
+        digest_fingerprint = fingerprint(triples_by_type)
+        cached = previous.get(institution)
+        if cached and cached.get("fingerprint") == digest_fingerprint and not force:
+            institutions[institution] = cached
+            continue
+
+        logger.info(f"Building digests for {institution}")
+        institutions[institution] = {
+            "fingerprint": digest_fingerprint,
+            "digests": {
+                doc_type: {
+                    "digest": write_digest(institution, doc_type, triples),
+                    "sources": sorted({t["source"] for t in triples}),
+                    "triple_count": len(triples),
+                }
+                for doc_type, triples in sorted(triples_by_type.items())
+            },
+        }
+        # Saved after every institution so a failed run keeps the digests built so far
+        write_index({"institutions": {**previous, **institutions}}, index_path)
+
+    # Institutions that no longer have triples are dropped only once the run completes
+    index = {"institutions": institutions}
+    write_index(index, index_path)
+    return index
+
+
+def write_index(index: dict, index_path: str = DEFAULT_SUMMARY_INDEX):
+    tmp_path = index_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, index_path)
+
+
+def overview_doc_types(question: str) -> List[str]:
+    """
+    Return the document types whose overview cue `question` matches, e.g.
+    "What programs does Douglas College offer?" -> ["Courses List"].
+    """
+    return [
+        doc_type for doc_type, pattern in DOC_TYPE_OVERVIEW_CUES.items()
+        if re.search(rf"\b({pattern})\b", question, re.IGNORECASE)
+    ]
+
+
+def topic_words(question: str) -> List[str]:
+    """
+    Return the words of `question` that are not institution names, document-type
+    keywords or overview phrasing, e.g. ["nursing"] for "Which nursing programs does
+    UBC offer?" (["which"] too: question words other than "what" ask for specifics).
+    """
+    words = re.findall(r"[a-z]+", remove_institutions(question).lower())
+    return [
+        word for word in words
+        if not OVERVIEW_WORDS.fullmatch(word)
+        and not any(re.fullmatch(pattern, word) for pattern in DOC_TYPE_KEYWORDS.values())
+    ]
+
+
+def route_overview(question: str, index: dict) -> Optional[List[dict]]:
+    """
+    Decide whether `question` is an overview question the digest index can answer:
+    it has a generic overview cue ("summarize", "priorities", "tell me about") or a
+    document-type cue ("programs ... offer", "mandate letter"), asks about a document
+    as a whole (no `topic_words` and no specific figure), and names institutions whose
+    digests cover the document types it asks about, each built from at least
+    MIN_DIGEST_TRIPLES triples. See ROUTING_EXAMPLES.
+
+    Parameters:
+        question (str): The user's question.
+        index (dict): Index produced by `build_index`.
+
+    Returns:
+        Optional[List[dict]]: The digests to answer from (each with institution, doc_type,
+        digest and sources), or None if the question needs full retrieval.
+    """
+    if DETAIL_PATTERN.search(question) or not (OVERVIEW_PATTERN.search(question) or overview_doc_types(question)):
+        return None
+    if topic_words(question):
+        return None
+    institutions = detect_institutions(question)
+    if not institutions:
+        return None
+
+    doc_types = requested_doc_types(question)
+    doc_types += [doc_type for doc_type in overview_doc_types(question) if doc_type not in doc_types]
+    selected = []
+    for institution in institutions:
+        available = index.get("institutions", {}).get(institution, {}).get("digests", {})
+        wanted = doc_types or list(available)
+        if not wanted or any(
+            available.get(doc_type, {}).get("triple_count", 0) < MIN_DIGEST_TRIPLES for doc_type in wanted
+        ):
+            return None
+        selected.extend(
+            {"institution": institution, "doc_type": doc_type, **available[doc_type]}
+            for doc_type in wanted
+        )
+    return selected
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+
+    parser = argparse.ArgumentParser(description="Build per-institution digests for overview questions.")
+    parser.add_argument("--output", default=DEFAULT_SUMMARY_INDEX, help="Path to the summary index (.json)")
+    parser.add_argument("--metadata", default=DEFAULT_METADATA, help="Path to pdf_metadata.json")
+    parser.add_argument("--force", action="store_true", help="Rebuild digests even if triples are unchanged")
+
+    args = parser.parse_args()
+    index = build_index(args.output, args.metadata, args.force)
+    logger.info(f"Summary index covers {len(index['institutions'])} institutions: {args.output}")
@@ -0,0 +1,261 @@
+import os
+import json
+import mmap
+import hashlib
+import struct
+import logging
+from typing import Dict, Iterable, Iterator, List, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ("subject", "predicate", "object", "institution", "source")
+DEFAULT_JSONL = "triples.jsonl"
+DEFAULT_STORE = "triples.bin"
+
+# File layout (little-endian):
+#   header   magic, version, n_rows, n_strings, blob_size
+#   offsets  uint64[n_strings + 1] byte offsets into the string blob
+#   columns  uint32[len(COLUMNS), n_rows] string ids, one column after another
+#   is_json  uint8[n_strings] 1 if the string is a JSON-encoded non-string value
+#   blob     UTF-8 bytes of every distinct string, concatenated
+_MAGIC = b"TRPL"
+_VERSION = 2
+_HEADER = struct.Struct("<4sIIIQ")
+
+
+class TripleStore:
+    """
+    Columnar, dictionary-encoded store of (subject, predicate, object, institution, source) triples.
+
+    Every distinct string is stored once in a shared pool; each column holds uint32 ids
+    into that pool. Row IDs are positions in the store, so `store[row_id]` is O(1).
+    A store loaded from disk is memory-mapped and decodes strings only on access.
+
+    Non-string values (e.g. an object extracted as a list) are stored as JSON text,
+    which is what row access returns; `to_jsonl` decodes them back.
+    """
+
+    def __init__(self, codes: np.ndarray, is_json: np.ndarray, strings: List[str] = None,
+                 offsets: np.ndarray = None, blob=None, handle=None):
+        self._codes = codes
+        self._is_json = is_json
+        self._offsets = offsets
+        self._blob = blob
+        self._handle = handle
+        self._strings = strings if strings is not None else [None] * (len(offsets) - 1)
+
+    @classmethod
+    def from_triples(cls, triples: Iterable[dict]) -> "TripleStore":
+        """
+        Build an in-memory store, interning every string.
+
+        Parameters:
+            triples (Iterable[dict]): Triples with subject/predicate/object and optional institution/source.
+
+        Returns:
+            TripleStore: The encoded triples.
+        """
+        pool: Dict[Tuple[str, bool], int] = {}
+        strings: List[str] = []
+        is_json: List[bool] = []
+        rows: List[List[int]] = []
+
+        for triple in triples:
+            row = []
+            for column in COLUMNS:
+                value = triple.get(column, "Unknown")
+                key = (value, False) if isinstance(value, str) else (json.dumps(value, ensure_ascii=False), True)
+                string_id = pool.get(key)
+                if string_id is None:
+                    string_id = pool[key] = len(strings)
+                    strings.append(key[0])
+                    is_json.append(key[1])
+                row.append(string_id)
+            rows.append(row)
+
+        codes = np.array(rows, dtype=np.uint32).reshape(-1, len(COLUMNS)).T.copy()
+        return cls(codes, np.array(is_json, dtype=np.uint8), strings=strings)
+
+    @classmethod
+    def from_jsonl(cls, filepath: str) -> "TripleStore":
+        with open(filepath, "r", encoding="utf-8") as f:
+            return cls.from_triples(json.loads(line) for line in f if line.strip())
+
+    @classmethod
+    def load(cls, filepath: str) -> "TripleStore":
+        """
+        Memory-map a store written by `save`.
+
+        Parameters:
+            filepath (str): Path to the binary store.
+
+        Returns:
+            TripleStore: A read-only store backed by the mapped file.
+        """
+        with open(filepath, "rb") as f:
+            handle = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, n_rows, n_strings, blob_size = _HEADER.unpack_from(handle, 0)
+        if magic != _MAGIC or version != _VERSION:
+            handle.close()
+            raise ValueError(f"Not a version {_VERSION} triple store: {filepath}")
+
+        offset = _HEADER.size
+        offsets = np.frombuffer(handle, dtype="<u8", count=n_strings + 1, offset=offset)
+        offset += offsets.nbytes
+        codes = np.frombuffer(handle, dtype="<u4", count=len(COLUMNS) * n_rows, offset=offset)
+        codes = codes.reshape(len(COLUMNS), n_rows)
+        offset += codes.nbytes
+        is_json = np.frombuffer(handle, dtype=np.uint8, count=n_strings, offset=offset)
+        offset += is_json.nbytes
+        blob = memoryview(handle)[offset:offset + blob_size]
+
+        return cls(codes, is_json, offsets=offsets, blob=blob, handle=handle)
+
+    def save(self, filepath: str):
+        """
+        Write the store in its binary format.
+
+        Parameters:
+            filepath (str): Destination path.
+        """
+        encoded = [self._string(i).encode("utf-8") for i in range(self.num_strings)]
+        offsets = np.zeros(len(encoded) + 1, dtype="<u8")
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+
+        tmp_path = filepath + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, _VERSION, len(self), len(encoded), int(offsets[-1])))
+            f.write(offsets.tobytes())
+            f.write(self._codes.astype("<u4").tobytes())
+            f.write(self._is_json.astype(np.uint8).tobytes())
+            f.write(b"".join(encoded))
+        os.replace(tmp_path, filepath)
+
+    def to_jsonl(self, filepath: str):
+        with open(filepath, "w", encoding="utf-8") as f:
+            for row_id in range(len(self)):
+                f.write(json.dumps(self.original(row_id)) + "\n")
+
+    def original(self, row_id: int) -> dict:
+        """Return row `row_id` with JSON-encoded values decoded back to lists/dicts/numbers."""
+        triple = self[row_id]
+        for c, column in enumerate(COLUMNS):
+            if self._is_json[self._codes[c, int(row_id)]]:
+                triple[column] = json.loads(triple[column])
+        return triple
+
+    def fingerprint(self) -> str:
+        """
+        Hash of the rows in order, so anything keyed by row ID can detect a changed store.
+
+        Returns:
+            str: Hex SHA-256 digest.
+        """
+        digest = hashlib.sha256()
+        for i in range(self.num_strings):
+            digest.update(self._string(i).encode("utf-8") + b"\0")
+        digest.update(self._codes.astype("<u4").tobytes())
+        digest.update(self._is_json.astype(np.uint8).tobytes())
+        return digest.hexdigest()
+
+    @property
+    def num_strings(self) -> int:
+        return len(self._strings)
+
+    def _string(self, string_id: int) -> str:
+        value = self._strings[string_id]
+        if value is None:
+            start, end = self._offsets[string_id], self._offsets[string_id + 1]
+            value = self._strings[string_id] = bytes(self._blob[start:end]).decode("utf-8")
+        return value
+
+    def __len__(self) -> int:
+        return self._codes.shape[1]
+
+    def __getitem__(self, row_id: int) -> dict:
+        row_id = int(row_id)
+        if not -len(self) <= row_id < len(self):
+            raise IndexError(f"Row {row_id} out of range for {len(self)} triples")
+        return {column: self._string(self._codes[c, row_id]) for c, column in enumerate(COLUMNS)}
+
+    def __iter__(self) -> Iterator[dict]:
+        for row_id in range(len(self)):
+            yield self[row_id]
+
+
+def check_roundtrip(jsonl_path: str = DEFAULT_JSONL) -> int:
+    """
+    Build a store from `jsonl_path`, save, reload and export it, and compare every row.
+
+    Parameters:
+        jsonl_path (str): Source triples in JSONL form.
+
+    Returns:
+        int: Number of rows that differ from the input after the round trip.
+    """
+    import tempfile
+
+    with open(jsonl_path, "r", encoding="utf-8") as f:
+        expected = [json.loads(line) for line in f if line.strip()]
+    with tempfile.TemporaryDirectory() as tmp:
+        store_path, export_path = os.path.join(tmp, "triples.bin"), os.path.join(tmp, "triples.jsonl")
+        TripleStore.from_triples(expected).save(store_path)
+        TripleStore.load(store_path).to_jsonl(export_path)
+        with open(export_path, "r", encoding="utf-8") as f:
+            exported = [json.loads(line) for line in f]
+
+    differing = sum(a != b for a, b in zip(expected, exported)) + abs(len(expected) - len(exported))
+    logger.info(f"Round trip of {len(expected)} triples: {differing} rows differ")
+    return differing
+
+
+def load_or_build(jsonl_path: str = DEFAULT_JSONL, store_path: str = DEFAULT_STORE) -> TripleStore:
+    """
+    Load the binary store, rebuilding it first if the JSONL source is newer or the
+    store was written in an older format.
+
+    Parameters:
+        jsonl_path (str): Source triples in JSONL form.
+        store_path (str): Binary store kept next to it.
+
+    Returns:
+        TripleStore: The memory-mapped store.
+    """
+    stale = not os.path.exists(store_path) or (
+        os.path.exists(jsonl_path) and os.path.getmtime(jsonl_path) > os.path.getmtime(store_path)
+    )
+    if not stale:
+        with open(store_path, "rb") as f:
+            header = f.read(_HEADER.size)
+        stale = len(header) < _HEADER.size or _HEADER.unpack(header)[:2] != (_MAGIC, _VERSION)
+    if stale:
+        store = TripleStore.from_jsonl(jsonl_path)
+        store.save(store_path)
+        logger.info(f"Built triple store with {len(store)} triples at {store_path}")
+    return TripleStore.load(store_path)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+
+    parser = argparse.ArgumentParser(description="Convert between triples.jsonl and the binary triple store.")
+    parser.add_argument("--input", default=DEFAULT_JSONL, help="Path to the input triples file (.jsonl)")
+    parser.add_argument("--output", default=DEFAULT_STORE, help="Path to the binary triple store")
+    parser.add_argument("--export", action="store_true", help="Export the binary store at --output back to --input")
+    parser.add_argument("--check", action="store_true", help="Check that --input survives a store round trip unchanged")
+
+    args = parser.parse_args()
+
+    if args.check:
+        raise SystemExit(1 if check_roundtrip(args.input) else 0)
+    elif args.export:
+        TripleStore.load(args.output).to_jsonl(args.input)
+        logger.info(f"Exported {args.output} to {args.input}")
+    else:
+        store = TripleStore.from_jsonl(args.input)
+        store.save(args.output)
+        logger.info(f"Stored {len(store)} triples ({store.num_strings} distinct strings) in {args.output}")
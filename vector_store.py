@@ -0,0 +1,182 @@
+import os
+import json
+import logging
+from typing import List, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_VECTOR_DIR = "vectors"
+FULL_FILE = "full.npy"
+INT8_FILE = "int8.npy"
+SCALE_FILE = "scale.npy"
+META_FILE = "meta.json"
+
+# Rows scored per block when scanning the int8 matrix; each search allocates one float32
+# scratch block of SCAN_BLOCK_ROWS x dim (6 MB at 1536 dims) and reuses it across blocks
+SCAN_BLOCK_ROWS = 1024
+
+
+class StaleVectorStoreError(RuntimeError):
+    """The local vectors were built for a different triple store than the one loaded."""
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def quantize_int8(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Symmetric per-vector int8 scalar quantization.
+
+    Parameters:
+        vectors (np.ndarray): Float vectors of shape (n, d).
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: int8 codes of shape (n, d) and float32 scales of shape (n,),
+        such that vectors ≈ codes * scales[:, None].
+    """
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales = np.maximum(scales, 1e-12).astype(np.float32)
+    codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales
+
+
+class LocalVectorStore:
+    """
+    Local cosine-similarity index over triple embeddings.
+
+    Row i holds the embedding of triple store row i. Search scans int8-quantized
+    vectors kept in memory (4x smaller than float32, plus a per-search scan block), then re-ranks a small
+    candidate set exactly against the full-precision vectors, which stay on disk
+    and are memory-mapped.
+    """
+
+    def __init__(self, full: np.ndarray, codes: np.ndarray, scales: np.ndarray, meta: dict = None):
+        self.full = full
+        self.codes = codes
+        self.scales = scales
+        self.meta = meta or {}
+
+    @classmethod
+    def from_vectors(cls, vectors: np.ndarray) -> "LocalVectorStore":
+        full = _normalize(vectors)
+        codes, scales = quantize_int8(full)
+        return cls(full, codes, scales)
+
+    @classmethod
+    def load(cls, directory: str = DEFAULT_VECTOR_DIR) -> "LocalVectorStore":
+        """
+        Load a store written by `save`: int8 codes into memory, full vectors memory-mapped.
+
+        Parameters:
+            directory (str): Directory holding the store files.
+
+        Returns:
+            LocalVectorStore: The loaded store.
+        """
+        meta_path = os.path.join(directory, META_FILE)
+        meta = {}
+        if os.path.exists(meta_path):
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        return cls(
+            np.load(os.path.join(directory, FULL_FILE), mmap_mode="r"),
+            np.load(os.path.join(directory, INT8_FILE)),
+            np.load(os.path.join(directory, SCALE_FILE)),
+            meta,
+        )
+
+    def save(self, directory: str = DEFAULT_VECTOR_DIR, triple_count: int = None, triple_fingerprint: str = None):
+        """
+        Write the store, recording which triple store its rows belong to.
+
+        Parameters:
+            directory (str): Directory to write the store files to.
+            triple_count (int): Number of rows in the triple store the vectors were built from.
+            triple_fingerprint (str): `TripleStore.fingerprint()` of that store.
+        """
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, FULL_FILE), np.asarray(self.full, dtype=np.float32))
+        np.save(os.path.join(directory, INT8_FILE), self.codes)
+        np.save(os.path.join(directory, SCALE_FILE), self.scales)
+        self.meta = {"triple_count": triple_count, "triple_fingerprint": triple_fingerprint}
+        with open(os.path.join(directory, META_FILE), "w", encoding="utf-8") as f:
+            json.dump(self.meta, f, indent=2)
+        logger.info(f"Saved {len(self)} vectors to {directory}")
+
+    def check_triples(self, triple_count: int, triple_fingerprint: str):
+        """
+        Make sure vector row i still is the embedding of triple store row i.
+
+        Parameters:
+            triple_count (int): Rows in the currently loaded triple store.
+            triple_fingerprint (str): Its `TripleStore.fingerprint()`.
+
+        Raises:
+            StaleVectorStoreError: If the vectors were built for other triples.
+        """
+        expected = (self.meta.get("triple_count"), self.meta.get("triple_fingerprint"))
+        if expected != (triple_count, triple_fingerprint) or len(self) != triple_count:
+            raise StaleVectorStoreError(
+                f"Local vectors ({len(self)} rows, built for {expected[0]} triples) do not match the "
+                f"current triple store ({triple_count} triples); re-run `python embed_and_store.py --backend local`"
+            )
+
+    def __len__(self) -> int:
+        return self.codes.shape[0]
+
+    @property
+    def memory_bytes(self) -> int:
+        """
+        Bytes needed for one first-pass search: int8 codes, scales and the float32 scratch
+        block it allocates (the full vectors are paged in on demand for re-ranking only).
+        """
+        scratch_rows = min(SCAN_BLOCK_ROWS, len(self))
+        return self.codes.nbytes + self.scales.nbytes + scratch_rows * self.codes.shape[1] * 4
+
+    def _approximate_scores(self, query: np.ndarray) -> np.ndarray:
+        # Per call, so concurrent searches on the shared store never share a buffer
+        buffer = np.empty((min(SCAN_BLOCK_ROWS, len(self)), self.codes.shape[1]), dtype=np.float32)
+        scores = np.empty(len(self), dtype=np.float32)
+        for start in range(0, len(self), SCAN_BLOCK_ROWS):
+            block = self.codes[start:start + SCAN_BLOCK_ROWS]
+            scratch = buffer[:len(block)]
+            np.copyto(scratch, block, casting="unsafe")
+            scores[start:start + len(block)] = scratch @ query
+        return scores * self.scales
+
+    @staticmethod
+    def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+        k = min(k, len(scores))
+        if k <= 0:
+            return np.array([], dtype=np.intp)
+        candidates = np.argpartition(-scores, k - 1)[:k]
+        return candidates[np.argsort(-scores[candidates])]
+
+    def search(self, query: List[float], top_k: int = 10, rerank: int = 50) -> List[Tuple[int, float]]:
+        """
+        Approximate top-k search with exact re-ranking.
+
+        Parameters:
+            query (List[float]): Query embedding.
+            top_k (int): Number of results to return.
+            rerank (int): Candidates taken from the int8 pass and re-scored in full precision.
+
+        Returns:
+            List[Tuple[int, float]]: (row_id, cosine similarity) pairs, best first.
+        """
+        query = _normalize(query)
+        candidates = self._top_k(self._approximate_scores(query), max(rerank, top_k))
+        candidates.sort()  # sequential reads from the memory-mapped file
+        exact = np.asarray(self.full[candidates], dtype=np.float32) @ query
+        order = np.argsort(-exact)[:top_k]
+        return [(int(candidates[i]), float(exact[i])) for i in order]
+
+    def exact_search(self, query: List[float], top_k: int = 10) -> List[Tuple[int, float]]:
+        """Brute-force full-precision search, used as the recall baseline."""
+        query = _normalize(query)
+        scores = np.asarray(self.full, dtype=np.float32) @ query
+        return [(int(i), float(scores[i])) for i in self._top_k(scores, top_k)]